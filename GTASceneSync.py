@@ -9,23 +9,115 @@ bl_info = {
 }
 
 import bpy
+import os
 import re
+import sys
+import functools
+import numpy as np
+from itertools import chain, repeat
 import struct
 import mathutils
 from pathlib import Path
+from bpy.app.handlers import persistent
 
 # ----------------------------
 # Helper Functions
 # ----------------------------
+_RE_NUM_SUFFIX = re.compile(r"\.\d+$")
 
+# binary output keeps the platform line ending text mode used to write
+_EOL = os.linesep.encode('ascii')
+# one IPL 'inst' row: id, model, interior, pos xyz, rot xyzw, lod
+_ROW = b"%d, %s, %d, %.6f, %.6f, %.6f, %.6f, %.6f, %.6f, %.6f, %d" + _EOL
+
+
+@functools.lru_cache(maxsize=4096)
 def clean_name(name: str) -> str:
     """Remove numeric suffixes from the model name."""
-    return re.sub(r"\.\d+$", "", name)
+    return _RE_NUM_SUFFIX.sub("", name)
 
 
 def clean_collection_name(name: str) -> str:
     """Strip the .dff suffix from collection names."""
-    return re.sub(r"\.dff$", "", name, flags=re.IGNORECASE)
+    return name[:-4] if name[-4:].lower() == ".dff" else name
+
+
+def selected_meshes(context):
+    """Selected mesh objects, in selection order."""
+    return [o for o in context.selected_objects if o.type == 'MESH']
+
+
+def model_name(obj) -> str:
+    """Model name for an object: its first collection's name, else its own cleaned name."""
+    coll = obj.users_collection[0] if obj.users_collection else None
+    return clean_collection_name(coll.name) if coll else clean_name(obj.name)
+
+
+def matrices_to_quaternions(rot):
+    """Convert an (N, 3, 3) stack of matrices to (N, 4) w, x, y, z quaternions.
+
+    Vectorized equivalent of ``Matrix.to_quaternion()`` (Shepperd's method):
+    axes are normalized first so object scale is ignored, reflections are
+    negated into rotations, and the result is renormalized and kept with a
+    non-negative w like Blender does.
+    """
+    norms = np.linalg.norm(rot, axis=1, keepdims=True)
+    rot = rot / np.where(norms == 0.0, 1.0, norms)
+    # mirrored (negative scale) matrices are reflections; negate them like Blender does
+    rot = np.where(np.linalg.det(rot)[:, None, None] < 0.0, -rot, rot)
+    m00, m01, m02 = rot[:, 0, 0], rot[:, 0, 1], rot[:, 0, 2]
+    m10, m11, m12 = rot[:, 1, 0], rot[:, 1, 1], rot[:, 1, 2]
+    m20, m21, m22 = rot[:, 2, 0], rot[:, 2, 1], rot[:, 2, 2]
+    trace = m00 + m11 + m22
+
+    # pick the largest of 4w^2, 4x^2, 4y^2, 4z^2 per row to stay stable
+    case = np.argmax(np.stack((trace, m00, m11, m22), axis=1), axis=1)
+    sq = np.stack((
+        1.0 + trace,
+        1.0 + m00 - m11 - m22,
+        1.0 - m00 + m11 - m22,
+        1.0 - m00 - m11 + m22,
+    ), axis=1)[np.arange(len(case)), case]
+    s = 2.0 * np.sqrt(np.maximum(sq, 1e-12))
+    quarter = 0.25 * s
+    a, b, c = (m21 - m12) / s, (m02 - m20) / s, (m10 - m01) / s
+    d, e, g = (m01 + m10) / s, (m02 + m20) / s, (m12 + m21) / s
+    quats = np.choose(case[:, None], (
+        np.stack((quarter, a, b, c), axis=1),
+        np.stack((a, quarter, d, e), axis=1),
+        np.stack((b, d, quarter, g), axis=1),
+        np.stack((c, e, g, quarter), axis=1),
+    ))
+    # shear (or zero scale) leaves the result off unit length; renormalize like Blender
+    quats /= np.linalg.norm(quats, axis=1, keepdims=True)
+    quats[quats[:, 0] < 0.0] *= -1.0
+    return quats
+
+
+def quaternion_multiply(a, b):
+    """Hamilton product ``a @ b`` of w, x, y, z quaternions, broadcasting over rows."""
+    aw, ax, ay, az = np.moveaxis(a, -1, 0)
+    bw, bx, by, bz = np.moveaxis(b, -1, 0)
+    return np.stack((
+        aw * bw - ax * bx - ay * by - az * bz,
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+    ), axis=-1)
+
+
+def _mirror_quats(quats, offset_quat=None):
+    """Turn (N, 4) w, x, y, z quaternions into IPL x, y, z, w rotations.
+
+    IPL stores x and z mirrored, i.e. the rotation conjugated by a half turn
+    about Y. Conjugation distributes over products, so the optional offset is
+    mirrored once and applied to the already mirrored rows.
+    """
+    mirror = np.array((1.0, -1.0, 1.0, -1.0))
+    quats = quats * mirror
+    if offset_quat is not None:
+        quats = quaternion_multiply(np.asarray(offset_quat, dtype=np.float64) * mirror, quats)
+    return quats[:, [1, 2, 3, 0]]
 
 # ----------------------------
 # Operators: GTASceneSync
@@ -42,7 +134,7 @@ class ExportAsIDE(bpy.types.Operator):
         self.layout.prop(self, "model_id")
 
     def execute(self, context):
-        objs = [o for o in context.selected_objects if o.type == 'MESH']
+        objs = selected_meshes(context)
         if not objs:
             self.report({'WARNING'}, "No mesh objects selected.")
             return {'CANCELLED'}
@@ -52,21 +144,22 @@ class ExportAsIDE(bpy.types.Operator):
         # use operator model_id, otherwise fallback to scene default
         start_id = self.model_id or getattr(context.scene, "gtass_model_id", 4542)
 
-        unique = {}
+        seen, rows = set(), []
         cur = start_id
         try:
             with open(self.filepath, 'w', encoding='utf-8') as f:
-                f.write('objs\n')
                 for obj in objs:
-                    coll = obj.users_collection[0] if obj.users_collection else None
-                    base = clean_collection_name(coll.name) if coll else clean_name(obj.name)
+                    base = model_name(obj)
+                    if base in seen:
+                        continue
+                    seen.add(base)
+                    # only the first object of each model is read; grab its props once
                     props = obj.ide_flags
-                    if base not in unique:
-                        unique[base] = (cur, props.texture_name, props.render_distance, props.ide_flag)
-                        cur += 1
-                for name, (mid, txd, dist, flag) in unique.items():
-                    f.write(f"{mid}, {name}, {txd}, {dist}, {flag}\n")
-                f.write('end\n')
+                    txd, dist, flag = props.texture_name, props.render_distance, props.ide_flag
+                    rows.append((cur, base, txd, dist, flag))
+                    cur += 1
+                # single write instead of one per line
+                f.write('objs\n' + "".join("%d, %s, %s, %d, %s\n" % r for r in rows) + 'end\n')
         except Exception as e:
             self.report({'ERROR'}, f"IDE export failed: {e}")
             return {'CANCELLED'}
@@ -106,49 +199,52 @@ class ExportAsIPL(bpy.types.Operator):
             p = p.with_suffix('.ipl')
         self.filepath = str(p)
 
-    def generate_mapping(self, objs):
+    def write_ipl(self, f, objs):
+        inter, lod = 0, -1
         mapping, cur = {}, self.model_id or bpy.context.scene.gtass_model_id
+        names, mids, mats = [], [], []
+        # bind lookups used by the loop to locals
+        resolve, mget = model_name, mapping.get
+        add_name, add_mid, add_mat = names.append, mids.append, mats.append
+        # single pass: resolve the name, assign ids (and encode) on first sight, grab the matrix
         for o in objs:
-            # Prefer collection name if present, otherwise cleaned object name
-            coll = o.users_collection[0] if o.users_collection else None
-            name = clean_collection_name(coll.name) if coll else clean_name(o.name)
-            name = name or 'Unnamed'
-            if name not in mapping:
-                mapping[name] = cur
+            nm = resolve(o) or 'Unnamed'
+            entry = mget(nm)
+            if entry is None:
+                entry = mapping[nm] = (cur, nm.encode('utf-8'))
                 cur += 1
-        return mapping
-
-    def write_ipl(self, f, objs, mapping):
-        inter, lod = 0, -1
-        fmt = lambda v: f"{v:.6f}"
-        # Always write ASCII .ipl (normal mode). Binary export removed.
-        f.write('# Exported with GTASceneSync\ninst\n')
-        for obj in objs:
-            wm = obj.matrix_world
-            pos = wm.to_translation(); base = wm.to_quaternion()
-            if self.apply_default_rotation:
-                off = mathutils.Euler(self.default_rotation,'XYZ').to_quaternion()
-                base = off @ base
-            rx, ry, rz, rw = -base.x, base.y, -base.z, base.w
-            coll = obj.users_collection[0] if obj.users_collection else None
-            nm = clean_collection_name(coll.name) if coll else clean_name(obj.name)
-            nm = nm or 'Unnamed'
-            mid = mapping.get(nm, -1)
-            f.write(
-                f"{mid}, {nm}, {inter}, {fmt(pos.x)}, {fmt(pos.y)}, {fmt(pos.z)}, {fmt(rx)}, {fmt(ry)}, {fmt(rz)}, {fmt(rw)}, {lod}\n"
-            )
-        f.write('end\n')
+            add_mid(entry[0])
+            add_name(entry[1])
+            add_mat(o.matrix_world)
+        mats = np.array(mats, dtype=np.float64).reshape(-1, 4, 4)
+        locs = mats[:, :3, 3]
+        off = None
+        if self.apply_default_rotation:
+            off = mathutils.Euler(self.default_rotation,'XYZ').to_quaternion()
+        rots = _mirror_quats(matrices_to_quaternions(mats[:, :3, :3]), off)
+
+        columns = np.hstack((locs, rots)).T.tolist()
+        # format every row with a single % over a repeated template
+        values = chain.from_iterable(
+            zip(mids, names, repeat(inter), *columns, repeat(lod))
+        )
+        # assemble in one growable buffer instead of chaining bytes copies
+        buf = bytearray(b'# Exported with GTASceneSync' + _EOL + b'inst' + _EOL)
+        buf += (_ROW * len(names)) % tuple(values)
+        buf += b'end' + _EOL
+        f.write(buf)
 
     def execute(self, context):
-        objs = [o for o in context.selected_objects if o.type == 'MESH']
+        objs = selected_meshes(context)
         if not objs:
             self.report({'WARNING'}, "No mesh objects selected.")
             return {'CANCELLED'}
         self.validate_filepath()
-        mapping = self.generate_mapping(objs)
         try:
-            with open(self.filepath, 'w', encoding='utf-8') as f:
-                self.write_ipl(f, objs, mapping)
+            # always a text .ipl; rows are preformatted as UTF-8 bytes, so the
+            # file goes through a binary handle and skips the text layer
+            with open(self.filepath, 'wb') as f:
+                self.write_ipl(f, objs)
         except Exception as e:
             self.report({'ERROR'}, f"IPL export failed: {e}")
             return {'CANCELLED'}
@@ -181,8 +277,9 @@ class OBJECT_OT_batch_rename(bpy.types.Operator):
         if not selected_objects:
             self.report({"WARNING"}, "No objects selected!")
             return {"CANCELLED"}
+        base_name = self.base_name
         for i, obj in enumerate(selected_objects, start=1):
-            obj.name = f"{self.base_name}_{i}"
+            obj.name = f"{base_name}_{i}"
         return {"FINISHED"}
 
 class OBJECT_OT_reset_position(bpy.types.Operator):
@@ -207,13 +304,13 @@ class OBJECT_OT_remove_materials(bpy.types.Operator):
     bl_options = {"REGISTER", "UNDO"}
 
     def execute(self, context):
-        selected_objects = context.selected_objects
-        if not selected_objects:
-            self.report({"WARNING"}, "No objects selected!")
+        objs = selected_meshes(context)
+        if not objs:
+            self.report({"WARNING"}, "No mesh objects selected!")
             return {"CANCELLED"}
-        for obj in selected_objects:
-            if obj.type == "MESH":
-                obj.data.materials.clear()
+        # linked duplicates share a mesh; clear each mesh only once
+        for mesh in dict.fromkeys(obj.data for obj in objs):
+            mesh.materials.clear()
         self.report({'INFO'}, "Materials removed from selected objects.")
         return {"FINISHED"}
 
@@ -234,28 +331,28 @@ class OBJECT_OT_convert_to_collision(bpy.types.Operator):
     bl_options = {"REGISTER", "UNDO"}
 
     def execute(self, context):
-        selected_objects = context.selected_objects
-        if not selected_objects:
-            self.report({"WARNING"}, "No objects selected!")
+        objs = selected_meshes(context)
+        if not objs:
+            self.report({"WARNING"}, "No mesh objects selected!")
             return {"CANCELLED"}
         count = 0
-        for obj in selected_objects:
-            if obj.type == "MESH":
-                # Use the registered PointerProperty (DFFProperties) to mark this as collision
-                try:
-                    obj.dff.type = 'COL'
-                    count += 1
-                except Exception:
-                    # As a fallback, write a custom property for compatibility
-                    obj["dff_type"] = "COL"
-                    count += 1
+        for obj in objs:
+            # Use the registered PointerProperty (DFFProperties) to mark this as collision
+            try:
+                obj.dff.type = 'COL'
+                count += 1
+            except Exception:
+                # As a fallback, write a custom property for compatibility
+                obj["dff_type"] = "COL"
+                count += 1
         self.report({'INFO'}, f"Marked {count} objects as collision objects.")
         return {"FINISHED"}
 
 # ----------------------------
 # PropertyGroup
 # ----------------------------
-IDE_FLAGS = [
+# immutable, shared items; identifiers are interned for cheap comparisons
+IDE_FLAGS = tuple((sys.intern(ident), name, desc) for ident, name, desc in (
     # Basic Flags (all models except peds/vehicles)
     ("4", "Draw Last", "Draw after opaque geometry. Automatically applies Additive."),
     ("8", "Additive", "Additive blending."),
@@ -282,8 +379,8 @@ IDE_FLAGS = [
     ("32768", "No Flyer Collide", "Prevents destruction by planes/helicopters (approximate)."),
 
     # Default flag
-    ("0", "(SA)Default", "No special flags")
-]
+    ("0", "(SA)Default", "No special flags"),
+))
 
 class IDEFlagsProperties(bpy.types.PropertyGroup):
     ide_flag: bpy.props.EnumProperty(name="IDE Flag", items=IDE_FLAGS, default='0')
@@ -293,6 +390,15 @@ class IDEFlagsProperties(bpy.types.PropertyGroup):
 # ----------------------------
 # UI Panel
 # ----------------------------
+# selected mesh count per view layer, filled lazily by draw() and dropped on
+# depsgraph updates, so the scan only happens when the panel is drawn
+_sel_mesh_counts = {}
+
+
+@persistent
+def _invalidate_sel_mesh_counts(scene, depsgraph=None):
+    _sel_mesh_counts.clear()
+
 class GTASceneSyncUIPanel(bpy.types.Panel):
     bl_label = "GTASceneSync"
     bl_idname = "VIEW3D_PT_gtascenesync"
@@ -303,7 +409,14 @@ class GTASceneSyncUIPanel(bpy.types.Panel):
     def draw(self, context):
         layout = self.layout
         scene = context.scene
-        sel_mesh_count = sum(1 for o in context.selected_objects if o.type=='MESH')
+        show = scene.gtass_show_per_object
+        # the expanded list needs the meshes anyway; otherwise use the cached count
+        key = context.view_layer.as_pointer()
+        meshes = None
+        sel_mesh_count = _sel_mesh_counts.get(key)
+        if show or sel_mesh_count is None:
+            meshes = selected_meshes(context)
+            sel_mesh_count = _sel_mesh_counts[key] = len(meshes)
 
         # Utility Tools
         layout.label(text="Utilities:")
@@ -325,14 +438,18 @@ class GTASceneSyncUIPanel(bpy.types.Panel):
         layout.separator()
 
         # Per-object settings
-        layout.label(text=f"Selected Objects: {sel_mesh_count}")
-        for obj in context.selected_objects:
-            if obj.type != 'MESH': continue
-            box = layout.box()
-            box.label(text=obj.name)
-            box.prop(obj.ide_flags, 'texture_name', text='TXD')
-            box.prop(obj.ide_flags, 'ide_flag', text='Flag')
-            box.prop(obj.ide_flags, 'render_distance', text='Draw Dist')
+        # only build the per-object widgets when expanded; they cost RNA calls per redraw
+        row = layout.row()
+        row.prop(scene, 'gtass_show_per_object', text='',
+                 icon='TRIA_DOWN' if show else 'TRIA_RIGHT', emboss=False)
+        row.label(text=f"Selected Objects: {sel_mesh_count}")
+        if show:
+            for obj in meshes:
+                box = layout.box()
+                box.label(text=obj.name)
+                box.prop(obj.ide_flags, 'texture_name', text='TXD')
+                box.prop(obj.ide_flags, 'ide_flag', text='Flag')
+                box.prop(obj.ide_flags, 'render_distance', text='Draw Dist')
         layout.separator()
 
         # Export buttons & defaults
@@ -360,9 +477,11 @@ class BatchSetTXD(bpy.types.Operator):
             self.report({'WARNING'}, "TXD name is empty.")
             return {'CANCELLED'}
         count = 0
-        for obj in context.selected_objects:
-            if obj.type == 'MESH':
-                obj.ide_flags.texture_name = txd
+        for obj in selected_meshes(context):
+            props = obj.ide_flags
+            # skip the write (and its update) when the TXD is already set
+            if props.texture_name != txd:
+                props.texture_name = txd
                 count += 1
         self.report({'INFO'}, f"Set TXD '{txd}' for {count} objects.")
         return {'FINISHED'}
@@ -386,13 +505,19 @@ def register():
     bpy.types.Scene.batch_rename_base_name = bpy.props.StringProperty(name="Base Rename Name", default="TypeName")
     # scene-level default starting model id
     bpy.types.Scene.gtass_model_id = bpy.props.IntProperty(name="Start Model ID", default=4542, min=0)
+    bpy.types.Scene.gtass_show_per_object = bpy.props.BoolProperty(name="Show Per-Object Settings", default=False)
+    bpy.app.handlers.depsgraph_update_post.append(_invalidate_sel_mesh_counts)
 
 def unregister():
+    if _invalidate_sel_mesh_counts in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(_invalidate_sel_mesh_counts)
+    _sel_mesh_counts.clear()
     del bpy.types.Object.ide_flags
     del bpy.types.Object.dff
     del bpy.types.Scene.batch_txd_name
     del bpy.types.Scene.batch_rename_base_name
     del bpy.types.Scene.gtass_model_id
+    del bpy.types.Scene.gtass_show_per_object
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
 
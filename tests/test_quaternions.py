@@ -0,0 +1,103 @@
+"""Tests for the bpy-free quaternion helpers used by the IPL exporter."""
+import sys
+import types
+from pathlib import Path
+
+import numpy as np
+
+# the addon imports bpy at module level; outside Blender a bare stand-in is
+# enough because only the pure numpy helpers are exercised here
+if "bpy" not in sys.modules:
+    try:
+        import bpy  # noqa: F401
+    except ImportError:
+        bpy = types.ModuleType("bpy")
+        bpy.types = types.SimpleNamespace(Operator=object, PropertyGroup=object, Panel=object)
+        bpy.props = types.SimpleNamespace(**{
+            name: (lambda *a, **k: None) for name in (
+                "StringProperty", "IntProperty", "BoolProperty",
+                "FloatVectorProperty", "EnumProperty", "PointerProperty",
+            )
+        })
+        handlers = types.ModuleType("bpy.app.handlers")
+        handlers.persistent = lambda func: func
+        bpy.app = types.SimpleNamespace(handlers=handlers)
+        sys.modules.update({
+            "bpy": bpy, "bpy.app": bpy.app, "bpy.app.handlers": handlers,
+            "mathutils": types.ModuleType("mathutils"),
+        })
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from GTASceneSync import _mirror_quats, matrices_to_quaternions, quaternion_multiply  # noqa: E402
+
+
+def quat_to_matrix(q):
+    w, x, y, z = q
+    return np.array([
+        [1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+        [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+        [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)],
+    ])
+
+
+def random_quats(n, seed=0):
+    quats = np.random.default_rng(seed).normal(size=(n, 4))
+    quats /= np.linalg.norm(quats, axis=1, keepdims=True)
+    quats[quats[:, 0] < 0.0] *= -1.0
+    # include the axis-aligned cases that hit each Shepperd branch
+    quats[:4] = np.eye(4)
+    return quats
+
+
+def test_positive_scale():
+    quats = random_quats(500)
+    scale = np.random.default_rng(1).uniform(0.1, 5.0, size=(500, 1, 3))
+    mats = np.array([quat_to_matrix(q) for q in quats]) * scale
+    result = matrices_to_quaternions(mats)
+    np.testing.assert_allclose(result, quats, atol=1e-9)
+
+
+def test_negative_scale():
+    quats = random_quats(500, seed=2)
+    scale = np.random.default_rng(3).uniform(0.1, 5.0, size=(500, 1, 3))
+    scale[:, :, 0] *= -1.0
+    mats = np.array([quat_to_matrix(q) for q in quats]) * scale
+    result = matrices_to_quaternions(mats)
+    # Blender negates the reflection R @ diag(-1, 1, 1) into R @ diag(1, -1, -1),
+    # a half turn about X applied after R
+    expected = quaternion_multiply(quats, np.array((0.0, 1.0, 0.0, 0.0)))
+    np.testing.assert_allclose(np.linalg.norm(result, axis=1), 1.0, atol=1e-9)
+    # q and -q are the same rotation (the sign is arbitrary when w == 0)
+    np.testing.assert_allclose(np.abs(np.sum(result * expected, axis=1)), 1.0, atol=1e-9)
+    np.testing.assert_allclose(matrices_to_quaternions(np.diag((-1.0, 1.0, 1.0))[None]),
+                               [[0.0, 1.0, 0.0, 0.0]], atol=1e-9)
+
+
+def test_mirror_without_offset():
+    quats = random_quats(50, seed=4)
+    w, x, y, z = quats.T
+    np.testing.assert_allclose(_mirror_quats(quats), np.stack((-x, y, -z, w), axis=1))
+
+
+def test_mirror_with_offset():
+    quats = random_quats(50, seed=5)
+    offset = random_quats(5, seed=6)[4]
+    w, x, y, z = quaternion_multiply(offset, quats).T
+    np.testing.assert_allclose(_mirror_quats(quats, tuple(offset)),
+                               np.stack((-x, y, -z, w), axis=1), atol=1e-12)
+
+
+def test_shear_and_zero_scale():
+    def rz(a):
+        c, s = np.cos(a), np.sin(a)
+        return np.array(((c, -s, 0.0), (s, c, 0.0), (0.0, 0.0, 1.0)))
+
+    def rx(a):
+        c, s = np.cos(a), np.sin(a)
+        return np.array(((1.0, 0.0, 0.0), (0.0, c, -s), (0.0, s, c)))
+
+    # child rotated under a non-uniformly scaled parent: a sheared matrix
+    sheared = np.diag((3.0, 1.0, 1.0)) @ rz(np.pi / 4) @ rx(0.3)
+    result = matrices_to_quaternions(np.stack((sheared, np.zeros((3, 3)))))
+    np.testing.assert_allclose(np.linalg.norm(result, axis=1), 1.0, atol=1e-12)
+    np.testing.assert_allclose(result[1], (1.0, 0.0, 0.0, 0.0))